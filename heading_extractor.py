@@ -2,10 +2,46 @@
 Heading Extractor using font-based analysis for detecting H1, H2, H3 headings
 """
 
+import heapq
 import re
 from typing import List, Dict, Any, Optional
 from collections import Counter
 
+
+def _keyword_trie_pattern(keywords: List[str]) -> str:
+    """
+    Build a regex that matches any of the keywords, with common prefixes
+    factored into a trie so a search scans the text once
+    
+    Args:
+        keywords (List[str]): Literal keywords to match
+        
+    Returns:
+        str: Regex pattern source
+    """
+    
+    # Build a dict-of-dicts trie; '' marks the end of a keyword
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    
+    def build(node: Dict) -> str:
+        if list(node) == ['']:
+            return ''
+        alternatives = [re.escape(char) + build(child)
+                        for char, child in sorted(node.items()) if char]
+        if len(alternatives) == 1 and '' not in node:
+            body = alternatives[0]
+        else:
+            body = '(?:' + '|'.join(alternatives) + ')'
+        return body + ('?' if '' in node else '')
+    
+    return build(trie)
+
+
 class HeadingExtractor:
     """
     Extract headings from PDF text blocks using font-based analysis
@@ -13,7 +49,7 @@ class HeadingExtractor:
     
     def __init__(self):
         # Heading patterns (common patterns for headings)
-        self.heading_patterns = [
+        heading_patterns = (
             r'^\d+\.?\s+',                    # "1. " or "1 "
             r'^\d+\.\d+\.?\s+',              # "1.1. " or "1.1 "
             r'^\d+\.\d+\.\d+\.?\s+',         # "1.1.1. " or "1.1.1 "
@@ -24,7 +60,27 @@ class HeadingExtractor:
             r'^Chapter\s+\d+',               # "Chapter 1"
             r'^Section\s+\d+',               # "Section 1"
             r'^Part\s+[IVX]+',               # "Part I"
-        ]
+        )
+        # Fused into one alternation: a single match call per block
+        self._heading_re = re.compile(
+            '|'.join(f'(?:{p})' for p in heading_patterns), re.IGNORECASE
+        )
+        
+        # Common header/footer patterns, as one alternation anchored at the
+        # start of the (lowercased) text
+        self._header_footer_re = re.compile(
+            r'\d+\s*$'       # Page number, optionally with trailing spaces
+            r'|page\s+\d+'   # "Page 1"
+            r'|copyright'     # Copyright notices
+            r'|\u00a9'        # Copyright symbol
+            r'|www\.|http'    # URLs
+            r'|@'             # Email addresses
+        )
+        
+        # Numbering patterns: "1. " and hierarchical "1.", "1.1.", "1.1.1."
+        # (level is the number of dots in the captured group)
+        self._num_re = re.compile(r'^\d+\.?\s+')
+        self._hier_num_re = re.compile(r'^(\d+(?:\.\d+){0,2})\.?\s+')
         
         # Common heading keywords
         self.heading_keywords = [
@@ -33,13 +89,16 @@ class HeadingExtractor:
             'acknowledgments', 'appendix', 'chapter', 'section', 'part',
             'table of contents', 'executive summary', 'literature review'
         ]
+        self._keywords_re = re.compile(_keyword_trie_pattern(self.heading_keywords))
     
-    def extract_title(self, pages_data: List[Dict]) -> str:
+    def extract_title(self, pages_data: List[Dict],
+                      doc_stats: Optional[Dict] = None) -> str:
         """
         Extract document title from the first page
         
         Args:
             pages_data (List[Dict]): Parsed pages data
+            doc_stats (Dict, optional): Precomputed document statistics
             
         Returns:
             str: Document title
@@ -51,7 +110,8 @@ class HeadingExtractor:
         first_page = pages_data[0]
         
         # Get document statistics for font analysis
-        doc_stats = self._get_doc_stats(pages_data)
+        if doc_stats is None:
+            doc_stats = self._get_doc_stats(pages_data)
         
         # Find the largest font text in the first page (likely title)
         title_candidates = []
@@ -62,12 +122,12 @@ class HeadingExtractor:
                 continue
             
             # Skip single characters or very long text
-            text = block['text'].strip()
+            text = block['text']
             if len(text) < 3 or len(text) > 200:
                 continue
             
             # Skip obvious non-titles
-            if self._is_likely_header_footer(text):
+            if self._is_likely_header_footer(block.get('text_lower') or text.lower()):
                 continue
             
             title_candidates.append({
@@ -92,12 +152,14 @@ class HeadingExtractor:
         
         return title if title else "Untitled Document"
     
-    def extract_headings(self, pages_data: List[Dict]) -> List[Dict[str, Any]]:
+    def extract_headings(self, pages_data: List[Dict],
+                         doc_stats: Optional[Dict] = None) -> List[Dict[str, Any]]:
         """
         Extract headings (H1, H2, H3) from all pages
         
         Args:
             pages_data (List[Dict]): Parsed pages data
+            doc_stats (Dict, optional): Precomputed document statistics
             
         Returns:
             List[Dict]: List of headings with level, text, and page
@@ -107,7 +169,8 @@ class HeadingExtractor:
             return []
         
         # Get document statistics
-        doc_stats = self._get_doc_stats(pages_data)
+        if doc_stats is None:
+            doc_stats = self._get_doc_stats(pages_data)
         
         # Extract all potential headings
         potential_headings = []
@@ -133,42 +196,90 @@ class HeadingExtractor:
         
         return final_headings
     
+    def calculate_heading_scores(self, blocks: List[Dict], doc_stats: Dict) -> List[float]:
+        """
+        Calculate heading scores for a batch of text blocks in one call
+        
+        Args:
+            blocks (List[Dict]): Text blocks to score
+            doc_stats (Dict): Document statistics
+            
+        Returns:
+            List[float]: Score between 0 and 1 for each block, in input order
+        """
+        
+        # Per-document thresholds, computed once for the whole batch
+        avg_font_size = doc_stats.get('avg_font_size', 12)
+        large_font_size = avg_font_size * 1.2
+        
+        scores = []
+        for block in blocks:
+            text = block['text']
+            text_lower = block.get('text_lower') or text.lower()
+            scores.append(self._score_heading(
+                text, block['font_size'], block['is_bold'], block['x_position'],
+                avg_font_size, large_font_size,
+                self._matches_heading_pattern(text),
+                self._contains_heading_keywords(text_lower)
+            ))
+        
+        return scores
+    
     def _extract_page_headings(self, page: Dict, doc_stats: Dict) -> List[Dict]:
         """Extract potential headings from a single page"""
         
         headings = []
         page_num = page['page_number']
         
+        # Per-document thresholds, hoisted out of the block loop
+        avg_font_size = doc_stats.get('avg_font_size', 12)
+        large_font_size = avg_font_size * 1.2
+        
         for block in page['text_blocks']:
-            text = block['text'].strip()
+            # Text arrives stripped from PDFParser, along with its lowercase form
+            text = block['text']
+            text_lower = block.get('text_lower') or text.lower()
             
             # Skip empty or very short text
             if len(text) < 2:
                 continue
             
             # Skip obvious non-headings
-            if self._is_likely_header_footer(text):
+            if self._is_likely_header_footer(text_lower):
                 continue
             
             # Skip very long text (likely paragraphs)
             if len(text) > 300:
                 continue
             
+            # Read each block field once
+            font_size = block['font_size']
+            is_bold = block['is_bold']
+            x_position = block['x_position']
+            
+            # Pattern/keyword checks are computed once and shared with scoring
+            matches_pattern = self._matches_heading_pattern(text)
+            contains_keywords = self._contains_heading_keywords(text_lower)
+            
             # Check if this could be a heading
-            heading_score = self._calculate_heading_score(block, doc_stats)
+            heading_score = self._score_heading(
+                text, font_size, is_bold, x_position,
+                avg_font_size, large_font_size,
+                matches_pattern, contains_keywords
+            )
             
             if heading_score > 0.3:  # Threshold for potential heading
                 headings.append({
                     'text': text,
                     'page': page_num,
-                    'font_size': block['font_size'],
-                    'is_bold': block['is_bold'],
+                    'font_size': font_size,
+                    'is_bold': is_bold,
                     'y_position': block['y_position'],
-                    'x_position': block['x_position'],
+                    'x_position': x_position,
                     'heading_score': heading_score,
                     'has_numbering': self._has_numbering(text),
-                    'matches_pattern': self._matches_heading_pattern(text),
-                    'contains_keywords': self._contains_heading_keywords(text)
+                    'matches_pattern': matches_pattern,
+                    'contains_keywords': contains_keywords
                 })
         
         return headings
@@ -181,47 +292,39 @@ class HeadingExtractor:
             float: Score between 0 and 1 (higher = more likely heading)
         """
         
-        text = block['text'].strip()
-        score = 0.0
-        
-        # Font size factor (larger = higher score)
-        avg_font_size = doc_stats.get('avg_font_size', 12)
-        if block['font_size'] > avg_font_size * 1.2:
-            score += 0.3
-        elif block['font_size'] > avg_font_size:
-            score += 0.15
-        
-        # Bold text factor
-        if block['is_bold']:
-            score += 0.2
-        
-        # Position factor (headings often left-aligned)
-        if block['x_position'] < 100:  # Assume left margin
-            score += 0.1
-        
-        # Pattern matching factor
-        if self._matches_heading_pattern(text):
-            score += 0.25
-        
-        # Keyword factor
-        if self._contains_heading_keywords(text):
-            score += 0.15
-        
-        # Length factor (headings are usually not too long)
-        if 5 <= len(text) <= 100:
-            score += 0.1
-        elif len(text) > 200:
-            score -= 0.2
-        
-        # Case factor (titles often have title case)
-        if self._is_title_case(text):
-            score += 0.1
-        elif text.isupper() and len(text) > 3:
-            score += 0.15
-        
-        # Line ending factor (headings usually don't end with periods)
-        if not text.endswith('.') and not text.endswith(','):
-            score += 0.05
+        return self.calculate_heading_scores([block], doc_stats)[0]
+    
+    def _score_heading(self, text: str, font_size: float, is_bold: bool,
+                       x_position: float, avg_font_size: float,
+                       large_font_size: float, matches_pattern: bool,
+                       contains_keywords: bool) -> float:
+        """Score a block from its already-extracted fields (see _calculate_heading_score)"""
+        
+        text_length = len(text)
+        is_title_case = self._is_title_case(text)
+        
+        # Sum of weighted boolean factors, added in a fixed order
+        score = (
+            # Font size factor (larger = higher score)
+            0.3 * (font_size > large_font_size)
+            + 0.15 * (avg_font_size < font_size <= large_font_size)
+            # Bold text factor
+            + 0.2 * is_bold
+            # Position factor (headings often left-aligned, assume left margin)
+            + 0.1 * (x_position < 100)
+            # Pattern matching factor
+            + 0.25 * matches_pattern
+            # Keyword factor
+            + 0.15 * contains_keywords
+            # Length factor (headings are usually not too long)
+            + 0.1 * (5 <= text_length <= 100)
+            - 0.2 * (text_length > 200)
+            # Case factor (titles often have title case, or are ALL CAPS)
+            + 0.1 * is_title_case
+            + 0.15 * (not is_title_case and text_length > 3 and text.isupper())
+            # Line ending factor (headings usually don't end with periods)
+            + 0.05 * (not text.endswith(('.', ',')))
+        )
         
         return min(score, 1.0)
     
@@ -236,25 +339,10 @@ class HeadingExtractor:
         # Sort headings by font size (descending)
         headings.sort(key=lambda x: x['font_size'], reverse=True)
         
-        # Get unique font sizes
-        font_sizes = list(set([h['font_size'] for h in headings]))
-        font_sizes.sort(reverse=True)
-        
-        # Assign levels based on font size hierarchy
-        size_to_level = {}
-        
-        if len(font_sizes) >= 3:
-            size_to_level[font_sizes[0]] = 'H1'
-            size_to_level[font_sizes[1]] = 'H2'
-            size_to_level[font_sizes[2]] = 'H3'
-            # Map remaining sizes to H3
-            for size in font_sizes[3:]:
-                size_to_level[size] = 'H3'
-        elif len(font_sizes) == 2:
-            size_to_level[font_sizes[0]] = 'H1'
-            size_to_level[font_sizes[1]] = 'H2'
-        elif len(font_sizes) == 1:
-            size_to_level[font_sizes[0]] = 'H1'
+        # Assign levels to the three largest unique font sizes; any smaller
+        # size falls through to H3 below
+        top_font_sizes = heapq.nlargest(3, {h['font_size'] for h in headings})
+        size_to_level = dict(zip(top_font_sizes, ('H1', 'H2', 'H3')))
         
         # Apply classification with pattern-based refinement
         classified = []
@@ -263,15 +351,12 @@ class HeadingExtractor:
             base_level = size_to_level.get(heading['font_size'], 'H3')
             
             # Refine level based on numbering patterns
-            text = heading['text'].strip()
+            text = heading['text']
             
-            # Check for hierarchical numbering
-            if re.match(r'^\d+\.?\s+', text):  # "1. " pattern
-                refined_level = 'H1'
-            elif re.match(r'^\d+\.\d+\.?\s+', text):  # "1.1. " pattern
-                refined_level = 'H2'
-            elif re.match(r'^\d+\.\d+\.\d+\.?\s+', text):  # "1.1.1. " pattern
-                refined_level = 'H3'
+            # Check for hierarchical numbering ("1. ", "1.1. ", "1.1.1. ")
+            match = self._hier_num_re.match(text)
+            if match:
+                refined_level = ('H1', 'H2', 'H3')[match.group(1).count('.')]
             else:
                 refined_level = base_level
             
@@ -283,13 +368,10 @@ class HeadingExtractor:
     def _get_doc_stats(self, pages_data: List[Dict]) -> Dict:
         """Get document statistics for analysis"""
         
-        all_font_sizes = []
-        all_blocks = []
-        
-        for page in pages_data:
-            for block in page['text_blocks']:
-                all_font_sizes.append(block['font_size'])
-                all_blocks.append(block)
+        # Collect font sizes in one pass; the reductions below run in C
+        all_font_sizes = [block['font_size']
+                          for page in pages_data
+                          for block in page['text_blocks']]
         
         if not all_font_sizes:
             return {'avg_font_size': 12}
@@ -298,24 +380,20 @@ class HeadingExtractor:
             'avg_font_size': sum(all_font_sizes) / len(all_font_sizes),
             'max_font_size': max(all_font_sizes),
             'min_font_size': min(all_font_sizes),
-            'total_blocks': len(all_blocks)
+            'total_blocks': len(all_font_sizes)
         }
     
     def _matches_heading_pattern(self, text: str) -> bool:
         """Check if text matches common heading patterns"""
-        for pattern in self.heading_patterns:
-            if re.match(pattern, text, re.IGNORECASE):
-                return True
-        return False
+        return self._heading_re.match(text) is not None
     
     def _has_numbering(self, text: str) -> bool:
         """Check if text starts with numbering"""
-        return bool(re.match(r'^\d+\.?\s+', text))
+        return bool(self._num_re.match(text))
     
-    def _contains_heading_keywords(self, text: str) -> bool:
-        """Check if text contains common heading keywords"""
-        text_lower = text.lower()
-        return any(keyword in text_lower for keyword in self.heading_keywords)
+    def _contains_heading_keywords(self, text_lower: str) -> bool:
+        """Check if (lowercased) text contains common heading keywords"""
+        return self._keywords_re.search(text_lower) is not None
     
     def _is_title_case(self, text: str) -> bool:
         """Check if text is in title case"""
@@ -323,33 +401,16 @@ class HeadingExtractor:
         if len(words) < 2:
             return False
         
-        title_words = 0
-        for word in words:
-            if word and word[0].isupper() and len(word) > 1:
-                title_words += 1
+        # Capitalised words longer than one character (split() never yields
+        # empty words, so word[0] is safe once the length check passes)
+        title_words = sum(1 for word in words if len(word) > 1 and word[0].isupper())
         
         return title_words / len(words) >= 0.6
     
-    def _is_likely_header_footer(self, text: str) -> bool:
-        """Check if text is likely a header or footer"""
-        text_lower = text.lower().strip()
-        
-        # Common header/footer patterns
-        header_footer_patterns = [
-            r'^\d+$',  # Just a page number
-            r'^page\s+\d+',  # "Page 1"
-            r'^\d+\s*$',  # Page number with spaces
-            r'^copyright',  # Copyright notices
-            r'^\u00a9',  # Copyright symbol
-            r'^©',  # Copyright symbol
-            r'^www\.',  # URLs
-            r'^http',  # URLs
-            r'@',  # Email addresses
-        ]
-        
-        for pattern in header_footer_patterns:
-            if re.match(pattern, text_lower):
-                return True
+    def _is_likely_header_footer(self, text_lower: str) -> bool:
+        """Check if (lowercased, stripped) text is likely a header or footer"""
+        if self._header_footer_re.match(text_lower):
+            return True
         
         # Very short text (likely page numbers)
         if len(text_lower) <= 3 and text_lower.isdigit():
@@ -4,16 +4,24 @@ Adobe Hackathon - Round 1A: Document Outline Extraction
 LOCAL TESTING VERSION - Works on Windows/Mac/Linux
 """
 
+import io
 import os
 import sys
 import json
 import time
+from contextlib import redirect_stdout
+from multiprocessing import Pool
 from pathlib import Path
 
 # Import our custom modules
 from pdf_parser import PDFParser
 from heading_extractor import HeadingExtractor
-from utils import save_json_output, validate_output
+from utils import ExtractionResult, save_json_output
+
+# Parser and extractor hold no per-document state, so one instance of each
+# is shared by every PDF processed in this process
+PARSER = PDFParser()
+EXTRACTOR = HeadingExtractor()
 
 def process_pdf(input_path, output_path):
     """
@@ -31,13 +39,9 @@ def process_pdf(input_path, output_path):
         
         print(f"📄 Processing: {input_path}")
         
-        # Initialize components
-        parser = PDFParser()
-        extractor = HeadingExtractor()
-        
         # Parse PDF and extract text with formatting info
         print("   📖 Parsing PDF...")
-        pages_data = parser.parse_pdf(input_path)
+        pages_data = PARSER.parse_pdf(input_path)
         
         if not pages_data:
             print(f"❌ Error: Could not parse PDF {input_path}")
@@ -45,31 +49,32 @@ def process_pdf(input_path, output_path):
         
         print(f"   ✅ Parsed {len(pages_data)} pages")
         
+        # Document statistics are shared by title and heading extraction
+        doc_stats = EXTRACTOR._get_doc_stats(pages_data)
+        
         # Extract document title
         print("   🏷️  Extracting title...")
-        title = extractor.extract_title(pages_data)
+        title = EXTRACTOR.extract_title(pages_data, doc_stats)
         print(f"   📝 Title: {title}")
         
         # Extract headings
         print("   🔍 Extracting headings...")
-        headings = extractor.extract_headings(pages_data)
+        headings = EXTRACTOR.extract_headings(pages_data, doc_stats)
         print(f"   📋 Found {len(headings)} headings")
         
-        # Create output structure
-        result = {
-            "title": title,
-            "outline": headings
-        }
-        
-        # Validate output format
+        # Create output structure; the schema is validated as it is built
         print("   ✅ Validating output...")
-        if not validate_output(result):
+        try:
+            result = ExtractionResult.from_outline(title, headings)
+        except ValueError as e:
+            for problem in str(e).splitlines():
+                print(f"Error: {problem}")
             print("❌ Error: Output validation failed")
             return False
         
         # Save to JSON
         print("   💾 Saving results...")
-        success = save_json_output(result, output_path)
+        success = save_json_output(result.to_dict(), output_path)
         
         processing_time = time.time() - start_time
         print(f"   ⏱️  Processed in {processing_time:.2f} seconds")
@@ -85,6 +90,32 @@ def process_pdf(input_path, output_path):
         traceback.print_exc()
         return False
 
+def _process_job(job):
+    """
+    Worker entry point: process one PDF, capturing its log output so that
+    logs from parallel workers don't interleave
+    
+    Args:
+        job (tuple): (input_path, output_path)
+    
+    Returns:
+        tuple: (input_path, output_path, success, log)
+    """
+    input_path, output_path = job
+    log = io.StringIO()
+    with redirect_stdout(log):
+        success = process_pdf(input_path, output_path)
+    return input_path, output_path, success, log.getvalue()
+
+def _run_jobs(jobs, workers):
+    """Yield job results, in completion order when running in parallel"""
+    if workers <= 1:
+        yield from map(_process_job, jobs)
+        return
+    
+    with Pool(workers) as pool:
+        yield from pool.imap_unordered(_process_job, jobs)
+
 def main():
     """Main function to process all PDFs in input directory"""
     
@@ -132,24 +163,26 @@ def main():
     print("PROCESSING STARTED")
     print("="*60)
     
-    # Process each PDF
+    # Process PDFs in parallel (each file is independent)
     success_count = 0
     total_files = len(pdf_files)
+    workers = min(total_files, os.cpu_count() or 1)
+    print(f"⚙️  Using {workers} worker process(es)")
     
-    for i, pdf_file in enumerate(pdf_files, 1):
-        print(f"\n📄 [{i}/{total_files}] Processing: {pdf_file.name}")
-        
-        # Generate output filename
-        output_filename = pdf_file.stem + ".json"
-        output_path = output_dir / output_filename
+    jobs = [(str(pdf_file), str(output_dir / (pdf_file.stem + ".json")))
+            for pdf_file in pdf_files]
+    
+    for i, (input_path, output_path, success, log) in enumerate(_run_jobs(jobs, workers), 1):
+        pdf_name = Path(input_path).name
+        print(f"\n📄 [{i}/{total_files}] Processing: {pdf_name}")
+        print(log, end="")
         
-        # Process the PDF
-        if process_pdf(str(pdf_file), str(output_path)):
+        if success:
             success_count += 1
-            print(f"✅ Successfully processed: {pdf_file.name}")
-            print(f"💾 Output saved: {output_path.name}")
+            print(f"✅ Successfully processed: {pdf_name}")
+            print(f"💾 Output saved: {Path(output_path).name}")
         else:
-            print(f"❌ Failed to process: {pdf_file.name}")
+            print(f"❌ Failed to process: {pdf_name}")
     
     # Summary
     print("\n" + "="*60)
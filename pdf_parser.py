@@ -15,33 +15,38 @@ class PDFParser:
     def __init__(self):
         self.supported_formats = ['pdf']
     
-    def parse_pdf(self, pdf_path: str) -> List[Dict[str, Any]]:
+    def parse_pdf(self, pdf_path: str, doc=None) -> List[Dict[str, Any]]:
         """
         Parse PDF and extract text with formatting information
         
         Args:
             pdf_path (str): Path to the PDF file
+            doc (fitz.Document, optional): Already-open document to parse
+                instead of opening pdf_path again; left open for the caller
             
         Returns:
             List[Dict]: List of pages with text blocks and formatting info
         """
         try:
-            # Open PDF document
-            doc = fitz.open(pdf_path)
-            pages_data = []
+            if doc is not None:
+                return self._extract_pages(doc)
             
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                page_data = self._extract_page_data(page, page_num + 1)
-                pages_data.append(page_data)
-            
-            doc.close()
-            return pages_data
+            # Open PDF document (closed on exit, including on errors)
+            with fitz.open(pdf_path) as doc:
+                return self._extract_pages(doc)
             
         except Exception as e:
             print(f"Error parsing PDF {pdf_path}: {str(e)}")
             return []
     
+    def _extract_pages(self, doc) -> List[Dict[str, Any]]:
+        """Extract page data for every page of an open document"""
+        
+        # Pages are parsed sequentially: PyMuPDF is not thread-safe, so
+        # parallelism happens across PDFs (one process per file) instead
+        return [self._extract_page_data(page, page_num)
+                for page_num, page in enumerate(doc, 1)]
+    
     def _extract_page_data(self, page, page_num: int) -> Dict[str, Any]:
         """
         Extract text blocks with formatting from a single page
@@ -61,22 +66,24 @@ class PDFParser:
             'page_bbox': page.rect
         }
         
+        # Get text blocks with formatting (dictionary format); only the
+        # extraction itself can fail, so only it is guarded
         try:
-            # Get text blocks with formatting (dictionary format)
             blocks = page.get_text("dict")
-            
-            # Process each block
-            for block in blocks.get("blocks", []):
-                if "lines" in block:  # Text block
-                    self._process_text_block(block, page_data)
-            
-            # Also get plain text for fallback
-            page_data['page_text'] = page.get_text()
-            
         except Exception as e:
             print(f"Error extracting page {page_num} data: {str(e)}")
-            # Fallback to plain text
-            page_data['page_text'] = page.get_text()
+            return page_data
+        
+        # Process each block
+        for block in blocks.get("blocks", []):
+            if "lines" in block:  # Text block
+                self._process_text_block(block, page_data)
+        
+        # Plain text from the spans we already have, rather than a second
+        # full get_text() layout pass
+        page_data['page_text'] = '\n'.join(
+            text_info['text'] for text_info in page_data['text_blocks']
+        )
         
         return page_data
     
@@ -89,6 +96,8 @@ class PDFParser:
             page_data (Dict): Page data to append to
         """
         
+        text_blocks = page_data['text_blocks']
+        
         for line in block.get("lines", []):
             for span in line.get("spans", []):
                 text = span.get("text", "").strip()
@@ -96,36 +105,21 @@ class PDFParser:
                 if not text:  # Skip empty text
                     continue
                 
-                # Extract formatting information
-                text_info = {
+                # Only the fields heading detection reads are kept per span
+                bbox = span.get("bbox", (0, 0, 0, 0))  # (x0, y0, x1, y1)
+                text_blocks.append({
                     'text': text,
+                    'text_lower': text.lower(),
                     'font_size': span.get("size", 12),
-                    'font_name': span.get("font", ""),
-                    'font_flags': span.get("flags", 0),  # Bold, italic flags
-                    'bbox': span.get("bbox", [0, 0, 0, 0]),  # [x0, y0, x1, y1]
-                    'color': span.get("color", 0),
-                    'line_bbox': line.get("bbox", [0, 0, 0, 0]),
-                    'block_bbox': block.get("bbox", [0, 0, 0, 0])
-                }
-                
-                # Add computed properties
-                text_info['is_bold'] = self._is_bold(text_info['font_flags'])
-                text_info['is_italic'] = self._is_italic(text_info['font_flags'])
-                text_info['x_position'] = text_info['bbox'][0]
-                text_info['y_position'] = text_info['bbox'][1]
-                text_info['text_width'] = text_info['bbox'][2] - text_info['bbox'][0]
-                text_info['text_height'] = text_info['bbox'][3] - text_info['bbox'][1]
-                
-                page_data['text_blocks'].append(text_info)
+                    'is_bold': self._is_bold(span.get("flags", 0)),
+                    'x_position': bbox[0],
+                    'y_position': bbox[1]
+                })
     
     def _is_bold(self, flags: int) -> bool:
         """Check if text is bold based on font flags"""
         return bool(flags & 2**4)  # Bold flag
     
-    def _is_italic(self, flags: int) -> bool:
-        """Check if text is italic based on font flags"""
-        return bool(flags & 2**1)  # Italic flag
-    
     def get_document_stats(self, pages_data: List[Dict]) -> Dict[str, Any]:
         """
         Get statistics about the document for better heading detection
@@ -6,10 +6,20 @@ Test script to demonstrate multilingual heading detection
 from heading_extractor import HeadingExtractor
 from utils import validate_output
 
+# Shared extractor, created on first use
+_EXTRACTOR = None
+
+def _get_extractor():
+    """Return the shared HeadingExtractor, creating it on first use"""
+    global _EXTRACTOR
+    if _EXTRACTOR is None:
+        _EXTRACTOR = HeadingExtractor()
+    return _EXTRACTOR
+
 def test_multilingual_headings():
     """Test heading detection with different languages"""
     
-    extractor = HeadingExtractor()
+    extractor = _get_extractor()
     
     # Sample headings in different languages
     test_headings = [
@@ -59,29 +69,28 @@ def test_multilingual_headings():
     
     doc_stats = {'avg_font_size': 12}  # Mock document stats
     
-    for heading in test_headings:
-        # Create mock text block
-        mock_block = {
+    # Create mock text blocks
+    mock_blocks = [
+        {
             'text': heading['text'],
             'font_size': 16,      # Larger than average (indicates heading)
             'is_bold': True,      # Bold formatting
             'x_position': 50,     # Left-aligned
             'y_position': 100
         }
-        
-        # Calculate heading score
-        score = extractor._calculate_heading_score(mock_block, doc_stats)
-        
+        for heading in test_headings
+    ]
+    
+    # Calculate all heading scores in one batch
+    scores = extractor.calculate_heading_scores(mock_blocks, doc_stats)
+    
+    for heading, score in zip(test_headings, scores):
         # Check if it matches numbering patterns
         has_numbering = extractor._has_numbering(heading['text'])
         
-        # Determine heading level based on numbering
-        if heading['text'].count('.') >= 2:  # 1.1.1 pattern
-            level = "H3"
-        elif heading['text'].count('.') >= 1:  # 1.1 pattern
-            level = "H2"
-        else:  # 1. pattern
-            level = "H1"
+        # Determine heading level based on numbering (1.1.1 / 1.1 / 1. patterns)
+        dots = heading['text'].count('.')
+        level = "H3" if dots >= 2 else "H2" if dots >= 1 else "H1"
         
         status = "✅ DETECTED" if score > 0.3 else "❌ MISSED"
         
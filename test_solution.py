@@ -7,6 +7,9 @@ import os
 import sys
 import time
 import json
+import pickle
+import tempfile
+from importlib.util import find_spec
 from pathlib import Path
 
 # Add current directory to path for imports
@@ -16,6 +19,24 @@ from pdf_parser import PDFParser
 from heading_extractor import HeadingExtractor
 from utils import validate_output, print_extraction_summary, create_sample_output
 
+# Shared component instances, created on first use so every test reuses them
+_PARSER = None
+_EXTRACTOR = None
+
+def _get_parser():
+    """Return the shared PDFParser, creating it on first use"""
+    global _PARSER
+    if _PARSER is None:
+        _PARSER = PDFParser()
+    return _PARSER
+
+def _get_extractor():
+    """Return the shared HeadingExtractor, creating it on first use"""
+    global _EXTRACTOR
+    if _EXTRACTOR is None:
+        _EXTRACTOR = HeadingExtractor()
+    return _EXTRACTOR
+
 def test_components():
     """Test individual components"""
     print("Testing individual components...")
@@ -23,7 +44,7 @@ def test_components():
     # Test PDF Parser
     print("\n1. Testing PDF Parser...")
     try:
-        parser = PDFParser()
+        parser = _get_parser()
         print("✓ PDF Parser initialized successfully")
     except Exception as e:
         print(f"✗ PDF Parser initialization failed: {e}")
@@ -32,14 +53,31 @@ def test_components():
     # Test Heading Extractor
     print("\n2. Testing Heading Extractor...")
     try:
-        extractor = HeadingExtractor()
+        extractor = _get_extractor()
         print("✓ Heading Extractor initialized successfully")
     except Exception as e:
         print(f"✗ Heading Extractor initialization failed: {e}")
         return False
     
+    # Test pickling: main.py's pool workers build their own extractor, but
+    # handing one to another process (e.g. a ProcessPoolExecutor task)
+    # pickles it, and the copy must score exactly like the original
+    print("\n3. Testing Heading Extractor pickling...")
+    blocks = [{'text': '1. Introduction', 'font_size': 16, 'is_bold': True, 'x_position': 50},
+              {'text': 'Body text in a paragraph', 'font_size': 12, 'is_bold': False, 'x_position': 120}]
+    doc_stats = {'avg_font_size': 12}
+    try:
+        copy = pickle.loads(pickle.dumps(extractor))
+        if copy.calculate_heading_scores(blocks, doc_stats) != extractor.calculate_heading_scores(blocks, doc_stats):
+            print("✗ Pickled Heading Extractor scores differ from the original")
+            return False
+        print("✓ Heading Extractor pickles correctly")
+    except Exception as e:
+        print(f"✗ Heading Extractor pickling failed: {e}")
+        return False
+    
     # Test validation
-    print("\n3. Testing Output Validation...")
+    print("\n4. Testing Output Validation...")
     sample_output = create_sample_output()
     if validate_output(sample_output):
         print("✓ Output validation working correctly")
@@ -60,9 +98,9 @@ def test_with_sample_pdf(pdf_path):
     try:
         start_time = time.time()
         
-        # Initialize components
-        parser = PDFParser()
-        extractor = HeadingExtractor()
+        # Get shared components
+        parser = _get_parser()
+        extractor = _get_extractor()
         
         # Parse PDF
         print("Parsing PDF...")
@@ -76,8 +114,9 @@ def test_with_sample_pdf(pdf_path):
         
         # Extract title and headings
         print("Extracting title and headings...")
-        title = extractor.extract_title(pages_data)
-        headings = extractor.extract_headings(pages_data)
+        doc_stats = extractor._get_doc_stats(pages_data)
+        title = extractor.extract_title(pages_data, doc_stats)
+        headings = extractor.extract_headings(pages_data, doc_stats)
         
         # Create result
         result = {
@@ -114,71 +153,64 @@ def test_docker_simulation():
     """Simulate Docker environment structure"""
     print("\nTesting Docker environment simulation...")
     
-    # Create test directory structure
-    test_dir = Path("test_docker_sim")
-    input_dir = test_dir / "input"
-    output_dir = test_dir / "output"
-    
     try:
-        # Create directories
-        input_dir.mkdir(parents=True, exist_ok=True)
-        output_dir.mkdir(parents=True, exist_ok=True)
-        
-        print(f"✓ Created test directories:")
-        print(f"  Input: {input_dir}")
-        print(f"  Output: {output_dir}")
-        
-        # Create a sample output to test JSON saving
-        sample_data = create_sample_output()
-        output_file = output_dir / "test_output.json"
-        
-        with open(output_file, 'w') as f:
-            json.dump(sample_data, f, indent=2)
-        
-        print(f"✓ Created sample output: {output_file}")
-        
-        # Verify file exists and is valid JSON
-        if output_file.exists():
-            with open(output_file, 'r') as f:
-                loaded_data = json.load(f)
+        # Create test directory structure in a temporary directory (removed
+        # automatically, usually RAM-backed)
+        with tempfile.TemporaryDirectory(prefix="test_docker_sim_") as test_dir:
+            input_dir = Path(test_dir) / "input"
+            output_dir = Path(test_dir) / "output"
             
-            if validate_output(loaded_data):
-                print("✓ Docker environment simulation successful")
-                return True
-        
-        return False
+            # Create directories
+            input_dir.mkdir()
+            output_dir.mkdir()
+            
+            print(f"✓ Created test directories:")
+            print(f"  Input: {input_dir}")
+            print(f"  Output: {output_dir}")
+            
+            # Create a sample output to test JSON saving
+            sample_data = create_sample_output()
+            output_file = output_dir / "test_output.json"
+            
+            with open(output_file, 'w') as f:
+                json.dump(sample_data, f, indent=2)
+            
+            print(f"✓ Created sample output: {output_file}")
+            
+            # Verify file exists and is valid JSON
+            if output_file.exists():
+                with open(output_file, 'r') as f:
+                    loaded_data = json.load(f)
+                
+                if validate_output(loaded_data):
+                    print("✓ Docker environment simulation successful")
+                    return True
+            
+            return False
         
     except Exception as e:
         print(f"✗ Docker simulation failed: {e}")
         return False
-    
-    finally:
-        # Clean up test directories
-        import shutil
-        if test_dir.exists():
-            shutil.rmtree(test_dir)
 
 def check_dependencies():
     """Check if all required dependencies are available"""
     print("Checking dependencies...")
     
+    # Third-party modules only (json, pathlib, re are standard library).
+    # find_spec checks availability without importing the module.
     required_modules = [
         'fitz',  # PyMuPDF
-        'pdfplumber',
-        'json',
-        'pathlib',
-        're'
+        'pdfplumber'
     ]
     
     missing_modules = []
     
     for module in required_modules:
-        try:
-            __import__(module)
-            print(f"✓ {module}")
-        except ImportError:
+        if find_spec(module) is None:
             print(f"✗ {module} - MISSING")
             missing_modules.append(module)
+        else:
+            print(f"✓ {module}")
     
     if missing_modules:
         print(f"\nMissing modules: {missing_modules}")
@@ -193,7 +225,7 @@ def run_performance_test():
     print("\nRunning performance tests...")
     
     # Test heading detection with various text samples
-    extractor = HeadingExtractor()
+    extractor = _get_extractor()
     
     test_cases = [
         "1. Introduction",
@@ -204,20 +236,23 @@ def run_performance_test():
         "3.2.1 Detailed Implementation"
     ]
     
-    print("Testing heading detection patterns:")
-    for text in test_cases:
-        # Simulate a text block
-        mock_block = {
+    # Simulate text blocks
+    mock_blocks = [
+        {
             'text': text,
             'font_size': 14,
             'is_bold': True,
             'x_position': 50,
             'y_position': 100
         }
-        
-        doc_stats = {'avg_font_size': 12}
-        score = extractor._calculate_heading_score(mock_block, doc_stats)
-        
+        for text in test_cases
+    ]
+    
+    doc_stats = {'avg_font_size': 12}
+    scores = extractor.calculate_heading_scores(mock_blocks, doc_stats)
+    
+    print("Testing heading detection patterns:")
+    for text, score in zip(test_cases, scores):
         print(f"  '{text[:30]}...' -> Score: {score:.2f}")
     
     print("✓ Performance test completed")
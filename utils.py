@@ -2,11 +2,42 @@
 Utility functions for JSON handling, validation, and file operations
 """
 
+import functools
 import json
 import os
-from typing import Dict, Any, List
+import re
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 
+try:
+    import orjson  # Optional: faster JSON encoding/decoding on UTF-8 bytes
+    _HAS_ORJSON = True
+except ImportError:
+    _HAS_ORJSON = False
+
+# Allowed heading levels and the fields every outline entry must have
+_HEADING_LEVELS: Tuple[str, ...] = ('H1', 'H2', 'H3')
+_HEADING_FIELDS: Tuple[str, ...] = ('level', 'text', 'page')
+
+# Control characters (except tab and newline) removed by clean_text
+_CTRL_TABLE = {c: None for c in range(32) if c not in (9, 10)}
+
+# Whitespace runs collapsed to a single space
+_WS_RE = re.compile(r'\s+')
+
+# Heading numbering prefixes removed by format_heading_text. Each prefix is
+# optional and they are tried in order, so one anchored pass strips the same
+# prefix sequence that applying them one after another would
+_HEADING_PREFIX_RE = re.compile(
+    r'^(?:\d+(?:\.\d+)*\.?\s+)?'    # "1. ", "1.1. ", "1.1.1. "
+    r'(?:(?i:[IVX]+)\.?\s+)?'        # "I. ", "II. ", "III. " (any case)
+    r'(?:[A-Z]\.?\s+)?'              # "A. ", "B. "
+    r'(?:\([a-z]\)\s+)?'             # "(a) ", "(b) "
+)
+
 def save_json_output(data: Dict[str, Any], output_path: str) -> bool:
     """
     Save the extraction result to JSON file
@@ -23,9 +54,13 @@ def save_json_output(data: Dict[str, Any], output_path: str) -> bool:
         output_dir = Path(output_path).parent
         output_dir.mkdir(parents=True, exist_ok=True)
         
-        # Save JSON with proper formatting
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        # Save JSON with proper formatting: serialise to UTF-8 bytes in
+        # memory, then write them in a single call
+        if _HAS_ORJSON:
+            payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        else:
+            payload = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+        Path(output_path).write_bytes(payload)
         
         print(f"Output saved to: {output_path}")
         return True
@@ -34,17 +69,130 @@ def save_json_output(data: Dict[str, Any], output_path: str) -> bool:
         print(f"Error saving JSON to {output_path}: {str(e)}")
         return False
 
-def validate_output(data: Dict[str, Any]) -> bool:
+def _heading_value_error(level: object, text: object, page: object) -> Optional[str]:
+    """Return the problem with a heading's level, text or page, or None if all are valid"""
+    
+    # Each isinstance() check narrows the value to a concrete type for the
+    # comparisons after it
+    if not isinstance(level, str) or level not in _HEADING_LEVELS:
+        return "level must be H1, H2, or H3"
+    
+    # isspace() tests for blank text without allocating a stripped copy
+    if not (isinstance(text, str) and text and not text.isspace()):
+        return "text must be a non-empty string"
+    
+    if not isinstance(page, int) or page < 1:
+        return "page must be a positive integer"
+    
+    return None
+
+def _heading_error(i: int, heading: object) -> Optional[str]:
+    """Return the first problem with outline entry i, or None if it is valid"""
+    
+    if not isinstance(heading, dict):
+        return f"Heading {i} must be a dictionary"
+    entry: Dict[str, Any] = heading
+    
+    # Check required fields
+    for name in _HEADING_FIELDS:
+        if name not in entry:
+            return f"Heading {i} missing '{name}' field"
+    
+    # Validate field types and values
+    error = _heading_value_error(entry['level'], entry['text'], entry['page'])
+    if error:
+        return f"Heading {i} {error}"
+    
+    return None
+
+@dataclass(slots=True, frozen=True)
+class Heading:
+    """A single outline entry, validated once when it is created"""
+    
+    level: str
+    text: str
+    page: int
+    
+    def __post_init__(self) -> None:
+        error = _heading_value_error(self.level, self.text, self.page)
+        if error:
+            raise ValueError(f"Heading {error}")
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the heading in output JSON form"""
+        return {'level': self.level, 'text': self.text, 'page': self.page}
+
+@dataclass(slots=True)
+class ExtractionResult:
+    """Extracted title and outline; the schema is checked at construction"""
+    
+    title: str
+    outline: List[Heading] = field(default_factory=list)
+    
+    def __post_init__(self) -> None:
+        if not isinstance(self.title, str):
+            raise ValueError("'title' must be a string")
+        
+        if not all(isinstance(heading, Heading) for heading in self.outline):
+            raise ValueError("'outline' must contain Heading entries")
+    
+    @classmethod
+    def from_outline(cls, title: str, outline: List[Dict[str, Any]]) -> 'ExtractionResult':
+        """
+        Build a result from extracted heading dictionaries
+        
+        Args:
+            title (str): Document title
+            outline (List[Dict]): Headings with 'level', 'text' and 'page'
+            
+        Returns:
+            ExtractionResult: The validated result
+            
+        Raises:
+            ValueError: If the title or any heading is invalid; every bad
+                heading is reported, one per line, with its index
+        """
+        headings: List[Heading] = []
+        errors: List[str] = []
+        for i, entry in enumerate(outline):
+            try:
+                headings.append(Heading(entry['level'], entry['text'], entry['page']))
+            except (KeyError, TypeError, ValueError) as e:
+                # Only failures pay for a second pass, which names the entry
+                errors.append(_heading_error(i, entry) or f"Heading {i} {e}")
+        
+        if errors:
+            raise ValueError('\n'.join(errors))
+        
+        return cls(title, headings)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the result to the output JSON structure
+        
+        Returns:
+            Dict: Dictionary with 'title' and 'outline' keys
+        """
+        return {
+            'title': self.title,
+            'outline': [heading.to_dict() for heading in self.outline]
+        }
+
+def validate_output(data: object) -> bool:
     """
     Validate the output format according to competition requirements
     
     Args:
-        data (Dict): The data to validate
+        data (Dict or ExtractionResult): The data to validate. An
+            ExtractionResult was already validated when it was built
         
     Returns:
         bool: True if valid, False otherwise
     """
     
+    if isinstance(data, ExtractionResult):
+        return True
+    
     try:
         # Check required top-level keys
         if not isinstance(data, dict):
@@ -65,35 +213,22 @@ def validate_output(data: Dict[str, Any]) -> bool:
             return False
         
         # Validate outline
-        if not isinstance(data['outline'], list):
+        outline = data['outline']
+        if not isinstance(outline, list):
             print("Error: 'outline' must be a list")
             return False
         
-        # Validate each heading in outline
-        for i, heading in enumerate(data['outline']):
-            if not isinstance(heading, dict):
-                print(f"Error: Heading {i} must be a dictionary")
-                return False
-            
-            # Check required fields
-            required_fields = ['level', 'text', 'page']
-            for field in required_fields:
-                if field not in heading:
-                    print(f"Error: Heading {i} missing '{field}' field")
-                    return False
-            
-            # Validate field types and values
-            if heading['level'] not in ['H1', 'H2', 'H3']:
-                print(f"Error: Heading {i} level must be H1, H2, or H3")
-                return False
-            
-            if not isinstance(heading['text'], str) or not heading['text'].strip():
-                print(f"Error: Heading {i} text must be a non-empty string")
-                return False
-            
-            if not isinstance(heading['page'], int) or heading['page'] < 1:
-                print(f"Error: Heading {i} page must be a positive integer")
-                return False
+        # Validate each heading in outline, collecting every bad heading
+        # and reporting them together in a single write
+        errors: List[str] = []
+        for i, heading in enumerate(outline):
+            error: Optional[str] = _heading_error(i, heading)
+            if error:
+                errors.append(error)
+        
+        if errors:
+            print('\n'.join(f"Error: {error}" for error in errors))
+            return False
         
         return True
         
@@ -112,8 +247,10 @@ def load_json_file(file_path: str) -> Dict[str, Any]:
         Dict: Loaded JSON data, empty dict if error
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        # Read raw bytes once; both parsers decode UTF-8 themselves
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        return orjson.loads(raw) if _HAS_ORJSON else json.loads(raw)
     except Exception as e:
         print(f"Error loading JSON from {file_path}: {str(e)}")
         return {}
@@ -131,14 +268,21 @@ def clean_text(text: str) -> str:
     if not text:
         return ""
     
+    # Normalize to composed form (NFC) so e.g. "o" + combining accent and "ó"
+    # compare equal; the quick check skips already-normalized text
+    if not unicodedata.is_normalized('NFC', text):
+        text = unicodedata.normalize('NFC', text)
+    
     # Remove extra whitespace
-    text = ' '.join(text.split())
+    text = _WS_RE.sub(' ', text)
     
     # Remove control characters
-    text = ''.join(char for char in text if ord(char) >= 32 or char in '\n\t')
+    text = text.translate(_CTRL_TABLE)
     
     return text.strip()
 
+# Section names repeat across documents, so recent results are memoized
+@functools.lru_cache(maxsize=4096)
 def format_heading_text(text: str) -> str:
     """
     Format heading text by removing numbering and cleaning
@@ -156,63 +300,62 @@ def format_heading_text(text: str) -> str:
     text = clean_text(text)
     
     # Remove common numbering patterns but keep the content
-    import re
-    
-    # Remove patterns like "1. ", "1.1. ", "1.1.1. "
-    text = re.sub(r'^\d+(\.\d+)*\.?\s+', '', text)
-    
-    # Remove patterns like "I. ", "II. ", "III. "
-    text = re.sub(r'^[IVX]+\.?\s+', '', text, flags=re.IGNORECASE)
-    
-    # Remove patterns like "A. ", "B. "
-    text = re.sub(r'^[A-Z]\.?\s+', '', text)
-    
-    # Remove patterns like "(a) ", "(b) "
-    text = re.sub(r'^\([a-z]\)\s+', '', text)
+    text = _HEADING_PREFIX_RE.sub('', text, count=1)
     
     # Clean up extra spaces
-    text = ' '.join(text.split())
+    text = _WS_RE.sub(' ', text)
     
     return text.strip()
 
-def get_file_size_mb(file_path: str) -> float:
+def get_file_size_mb(file_path: str, st: Optional[os.stat_result] = None) -> float:
     """
     Get file size in megabytes
     
     Args:
         file_path (str): Path to the file
+        st (os.stat_result, optional): Existing stat result for the file,
+            reused instead of calling stat again
         
     Returns:
         float: File size in MB
     """
     try:
-        size_bytes = os.path.getsize(file_path)
-        return size_bytes / (1024 * 1024)
+        if st is None:
+            st = os.stat(file_path)
+        return st.st_size / (1024 * 1024)
     except Exception:
         return 0.0
 
-def validate_pdf_constraints(pdf_path: str) -> bool:
+def validate_pdf_constraints(pdf_path: str, doc=None) -> bool:
     """
     Validate PDF meets competition constraints
     
     Args:
         pdf_path (str): Path to PDF file
+        doc (fitz.Document, optional): Already-open document for pdf_path,
+            reused (and left open) so the file isn't parsed twice; pass the
+            same document on to PDFParser.parse_pdf
         
     Returns:
         bool: True if valid, False otherwise
     """
     try:
-        import fitz  # PyMuPDF
+        import fitz  # type: ignore[import-untyped]  # PyMuPDF, ships no type stubs
+        
+        # Stat once: fails early for a missing file and gives us the size
+        st = os.stat(pdf_path)
         
         # Check file size (should be reasonable)
-        file_size_mb = get_file_size_mb(pdf_path)
+        file_size_mb = get_file_size_mb(pdf_path, st)
         if file_size_mb > 100:  # 100MB limit (reasonable assumption)
             print(f"Warning: PDF file is large ({file_size_mb:.1f} MB)")
         
         # Check page count
-        doc = fitz.open(pdf_path)
-        page_count = len(doc)
-        doc.close()
+        if doc is not None:
+            page_count = len(doc)
+        else:
+            with fitz.open(pdf_path) as doc:
+                page_count = len(doc)
         
         if page_count > 50:
             print(f"Error: PDF has {page_count} pages (max 50 allowed)")
@@ -225,13 +368,17 @@ def validate_pdf_constraints(pdf_path: str) -> bool:
         print(f"Error validating PDF {pdf_path}: {str(e)}")
         return False
 
-def print_extraction_summary(result: Dict[str, Any]) -> None:
+def print_extraction_summary(result: Dict[str, Any], verbose: bool = True) -> None:
     """
     Print a summary of the extraction results
     
     Args:
         result (Dict): The extraction result
+        verbose (bool): When False, skip the summary entirely
     """
+    if not verbose:
+        return
+    
     print("\n" + "="*50)
     print("EXTRACTION SUMMARY")
     print("="*50)
@@ -242,15 +389,9 @@ def print_extraction_summary(result: Dict[str, Any]) -> None:
     print(f"Total headings found: {len(outline)}")
     
     if outline:
-        # Count by level
-        level_counts = {'H1': 0, 'H2': 0, 'H3': 0}
-        pages_with_headings = set()
-        
-        for heading in outline:
-            level = heading.get('level', 'Unknown')
-            if level in level_counts:
-                level_counts[level] += 1
-            pages_with_headings.add(heading.get('page', 0))
+        # Count by level (missing levels count as 0)
+        level_counts = Counter(heading.get('level', 'Unknown') for heading in outline)
+        pages_with_headings = {heading.get('page', 0) for heading in outline}
         
         print(f"H1 headings: {level_counts['H1']}")
         print(f"H2 headings: {level_counts['H2']}")
@@ -258,8 +399,11 @@ def print_extraction_summary(result: Dict[str, Any]) -> None:
         print(f"Pages with headings: {len(pages_with_headings)}")
         
         print("\nFirst few headings:")
-        for i, heading in enumerate(outline[:5]):
-            print(f"  {heading['level']} (p.{heading['page']}): {heading['text'][:60]}...")
+        for heading in outline[:5]:
+            level = heading.get('level', 'Unknown')
+            page = heading.get('page', 0)
+            text = heading.get('text', '')
+            print(f"  {level} (p.{page}): {text[:60]}...")
     
     print("="*50)
 